@@ -0,0 +1,153 @@
+import json
+import os
+import re
+
+import streamlit as st
+
+# 지역관서(지구대/파출소) 관할 구역 확인
+# 관할 경계 GeoJSON을 한 번 읽어 격자(바운딩 박스) 색인을 만들고, 좌표가 속한 관서를 찾음
+# 어느 관할에도 속하지 않는 좌표는 고양시 밖으로 잘못 지오코딩된 것으로 봄
+
+JURISDICTION_GEOJSON_PATH = os.getenv(
+    "JURISDICTION_GEOJSON_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "jurisdictions.geojson")
+)
+# 관서 이름이 들어 있는 feature 속성 (앞에 있는 것부터 사용)
+NAME_PROPERTIES = ["해당관서", "name", "NAME"]
+GRID_SIZE = 32
+
+
+# "화정지구대(031-930-6112)" -> "화정지구대"
+def station_name(value):
+    return re.sub(r"\(.*?\)", "", str(value or "")).strip()
+
+
+def _polygons(geometry):
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def _bbox(rings):
+    xs = [x for ring in rings for x, y, *_ in ring]
+    ys = [y for ring in rings for x, y, *_ in ring]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _point_in_ring(x, y, ring):
+    inside = False
+    x1, y1 = ring[-1][:2]
+    for point in ring:
+        x2, y2 = point[:2]
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+# 바깥 고리 안이면서 구멍(안쪽 고리) 밖인 경우
+def _point_in_polygon(x, y, rings):
+    return _point_in_ring(x, y, rings[0]) and not any(_point_in_ring(x, y, hole) for hole in rings[1:])
+
+
+def build_jurisdiction_index(geojson):
+    districts = []
+    for feature in geojson.get("features", []):
+        properties = feature.get("properties") or {}
+        name = next((properties[key] for key in NAME_PROPERTIES if properties.get(key)), None)
+        if not name or not feature.get("geometry"):
+            continue
+        for rings in _polygons(feature["geometry"]):
+            districts.append({"name": name, "rings": rings, "bbox": _bbox(rings)})
+    if not districts:
+        return None
+
+    min_x = min(d["bbox"][0] for d in districts)
+    min_y = min(d["bbox"][1] for d in districts)
+    max_x = max(d["bbox"][2] for d in districts)
+    max_y = max(d["bbox"][3] for d in districts)
+    cell_w = (max_x - min_x) / GRID_SIZE or 1e-9
+    cell_h = (max_y - min_y) / GRID_SIZE or 1e-9
+    # 격자 칸마다 바운딩 박스가 겹치는 구역 목록 (조회 시 후보만 정밀 판정)
+    grid = {}
+    for i, district in enumerate(districts):
+        x0, y0, x1, y1 = district["bbox"]
+        for gx in range(int((x0 - min_x) / cell_w), min(int((x1 - min_x) / cell_w), GRID_SIZE - 1) + 1):
+            for gy in range(int((y0 - min_y) / cell_h), min(int((y1 - min_y) / cell_h), GRID_SIZE - 1) + 1):
+                grid.setdefault((gx, gy), []).append(i)
+    return {
+        "districts": districts,
+        "bbox": (min_x, min_y, max_x, max_y),
+        "cell": (cell_w, cell_h),
+        "grid": grid,
+    }
+
+
+# 관할 경계 파일 버전 (수정 시각, 파일이 없으면 None)
+def jurisdiction_data_version(path=JURISDICTION_GEOJSON_PATH):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+# 관할 경계 색인 (파일이 바뀌면 mtime이 달라져 다시 생성됨)
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_jurisdiction_index(path, mtime):
+    with open(path, encoding="utf-8") as f:
+        return build_jurisdiction_index(json.load(f))
+
+
+# 경계 파일이 없으면 None (관할 확인 단계 생략)
+def get_jurisdiction_index(path=JURISDICTION_GEOJSON_PATH):
+    mtime = jurisdiction_data_version(path)
+    if mtime is None:
+        return None
+    return load_jurisdiction_index(path, mtime)
+
+
+# 좌표가 속한 관서 이름 (어느 관할에도 속하지 않으면 None)
+def find_jurisdiction(index, lat, lon):
+    min_x, min_y, max_x, max_y = index["bbox"]
+    if not (min_x <= lon <= max_x and min_y <= lat <= max_y):
+        return None
+    cell_w, cell_h = index["cell"]
+    cell = (min(int((lon - min_x) / cell_w), GRID_SIZE - 1), min(int((lat - min_y) / cell_h), GRID_SIZE - 1))
+    for i in index["grid"].get(cell, []):
+        district = index["districts"][i]
+        x0, y0, x1, y1 = district["bbox"]
+        if x0 <= lon <= x1 and y0 <= lat <= y1 and _point_in_polygon(lon, lat, district["rings"]):
+            return district["name"]
+    return None
+
+
+# 전체 순찰장소의 해당관서를 좌표 기준으로 확인
+# coords: 주소 -> {"lat", "lon"} (CSV에 좌표가 없는 장소에 사용, 선택)
+# status: ok(일치) / unassigned(해당관서 비어 있음, 좌표상 관서로 채울 수 있음) /
+#         mismatch(불일치) / out_of_area(고양시 밖 좌표) / no_coords(좌표 없음)
+def check_jurisdictions(index, patrol_locations, coords=None):
+    results = []
+    for team, locations in patrol_locations.items():
+        for location, info in locations.items():
+            point = coords.get(info["address"]) if coords else None
+            if info.get("lat") is not None and info.get("lon") is not None:
+                point = {"lat": info["lat"], "lon": info["lon"]}
+            expected = station_name(info.get("해당관서"))
+            assigned = find_jurisdiction(index, point["lat"], point["lon"]) if point else None
+            if not point:
+                status = "no_coords"
+            elif assigned is None:
+                status = "out_of_area"
+            elif not expected:
+                status = "unassigned"
+            elif station_name(assigned) != expected:
+                status = "mismatch"
+            else:
+                status = "ok"
+            results.append({
+                "자율방범대": team,
+                "순찰장소": location,
+                "해당관서": info.get("해당관서"),
+                "좌표상 관서": assigned,
+                "status": status,
+            })
+    return results
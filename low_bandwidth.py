@@ -0,0 +1,196 @@
+import io
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import streamlit as st
+from PIL import Image, ImageDraw
+
+# 저대역폭(모바일) 모드
+# 대화형 지도(Leaflet/Mapbox 번들 + 타일) 대신 로컬에 캐시된 타일로 만든 작은 정적 지도 이미지를 사용
+
+TILE_URL = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+TILE_SIZE = 256
+# 타일은 한 번 받으면 디스크에 저장해 두고 재사용
+TILE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tile_cache")
+
+STATIC_MAP_ZOOM = 15
+STATIC_MAP_SIZE = (360, 240)
+
+# 타일 서버에 닿지 않을 때 화면이 오래 멈추지 않도록
+# 타일은 동시에 받고(장당 TILE_TIMEOUT초), 지도 한 장에 TILE_FETCH_BUDGET초까지만 기다림
+# 받지 못한 타일은 TILE_FAILURE_TTL초 동안 다시 요청하지 않음
+TILE_TIMEOUT = 2
+TILE_FETCH_BUDGET = 3
+TILE_FAILURE_TTL = 60
+TILE_FETCH_WORKERS = 6
+
+_failed_tiles = {}
+_failed_tiles_lock = threading.Lock()
+
+
+# 저대역폭 모드 자동 감지 (?lite=1 주소 또는 브라우저의 데이터 절약(Save-Data) 설정)
+def detect_low_bandwidth():
+    if st.query_params.get("lite") in ("1", "true", "on"):
+        return True
+    context = getattr(st, "context", None)
+    headers = getattr(context, "headers", None) or {}
+    return str(headers.get("Save-Data", "")).lower() == "on"
+
+
+def _lat_lon_to_pixel(lat, lon, zoom):
+    scale = TILE_SIZE * 2 ** zoom
+    x = (lon + 180.0) / 360.0 * scale
+    sin_lat = math.sin(math.radians(lat))
+    y = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * scale
+    return x, y
+
+
+def _meters_per_pixel(lat, zoom):
+    return 156543.03392 * math.cos(math.radians(lat)) / 2 ** zoom
+
+
+# 화면(픽셀 좌표 기준)을 덮는 타일 번호 목록
+def _tiles_covering(left, top, width, height):
+    return [
+        (tile_x, tile_y)
+        for tile_x in range(int(left // TILE_SIZE), int((left + width) // TILE_SIZE) + 1)
+        for tile_y in range(int(top // TILE_SIZE), int((top + height) // TILE_SIZE) + 1)
+    ]
+
+
+def _tile_path(zoom, x, y):
+    return os.path.join(TILE_CACHE_DIR, str(zoom), str(x), f"{y}.png")
+
+
+def _recently_failed(key):
+    with _failed_tiles_lock:
+        failed_at = _failed_tiles.get(key)
+        if failed_at is not None and time.monotonic() - failed_at >= TILE_FAILURE_TTL:
+            del _failed_tiles[key]
+            failed_at = None
+    return failed_at is not None
+
+
+# 타일 가져오기 (디스크 캐시 우선, 실패하면 None)
+# 백그라운드 스레드에서도 호출되므로 st.* 화면 출력을 하지 않음
+def get_tile(zoom, x, y):
+    path = _tile_path(zoom, x, y)
+    if os.path.exists(path):
+        return Image.open(path).convert("RGB")
+    if _recently_failed((zoom, x, y)):
+        return None
+    try:
+        request = urllib.request.Request(
+            TILE_URL.format(z=zoom, x=x, y=y),
+            headers={"User-Agent": "goyang-patrol-app"}
+        )
+        with urllib.request.urlopen(request, timeout=TILE_TIMEOUT) as response:
+            data = response.read()
+        tile = Image.open(io.BytesIO(data)).convert("RGB")
+    except Exception:
+        with _failed_tiles_lock:
+            _failed_tiles[(zoom, x, y)] = time.monotonic()
+        return None
+    # 임시 파일에 다 쓴 뒤 교체 (다른 세션이 쓰는 도중의 파일을 읽거나 잘린 파일이 남지 않도록)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+        f.write(data)
+    os.replace(f.name, path)
+    return tile
+
+
+# 타일 동시 요청용 스레드 풀 (프로세스당 하나, 모든 세션이 공유)
+@st.cache_resource(show_spinner=False)
+def get_tile_executor():
+    return ThreadPoolExecutor(max_workers=TILE_FETCH_WORKERS, thread_name_prefix="tile")
+
+
+# 여러 타일을 동시에 받아 {(x, y): 타일} 반환 (제한 시간 안에 받지 못한 타일은 None)
+# 제한 시간이 지난 요청은 백그라운드에서 계속 진행되어 디스크 캐시에 저장되므로 다음 화면에서 사용됨
+def fetch_tiles(zoom, tiles, budget=TILE_FETCH_BUDGET):
+    executor = get_tile_executor()
+    futures = {executor.submit(get_tile, zoom, x, y): (x, y) for x, y in tiles}
+    done, _ = wait(futures, timeout=budget)
+    return {key: future.result() if future in done else None for future, key in futures.items()}
+
+
+# 일부 타일을 받지 못한 지도 (캐시하지 않고 이번 화면에만 사용)
+class IncompleteMapError(Exception):
+    def __init__(self, image):
+        super().__init__("일부 지도 타일을 받지 못했습니다.")
+        self.image = image
+
+
+# 순찰 지역 반경(기본 300m)을 빨간 원으로 표시한 정적 지도 (장소별로 한 번만 생성해 모든 세션이 공유)
+# 타일이 빠진 이미지는 캐시하지 않으므로 다음 화면에서 다시 시도함
+def render_static_map(lat, lon, radius_m=300, zoom=STATIC_MAP_ZOOM, size=STATIC_MAP_SIZE):
+    try:
+        return _render_static_map(lat, lon, radius_m, zoom, size)
+    except IncompleteMapError as e:
+        return e.image
+
+
+@st.cache_data(show_spinner=False)
+def _render_static_map(lat, lon, radius_m, zoom, size):
+    width, height = size
+    center_x, center_y = _lat_lon_to_pixel(lat, lon, zoom)
+    left = center_x - width / 2
+    top = center_y - height / 2
+
+    image = Image.new("RGB", size, (229, 227, 223))
+    complete = True
+    for (tile_x, tile_y), tile in fetch_tiles(zoom, _tiles_covering(left, top, width, height)).items():
+        if tile is None:
+            complete = False
+        else:
+            image.paste(tile, (int(tile_x * TILE_SIZE - left), int(tile_y * TILE_SIZE - top)))
+
+    radius = radius_m / _meters_per_pixel(lat, zoom)
+    box = [width / 2 - radius, height / 2 - radius, width / 2 + radius, height / 2 + radius]
+    overlay = Image.new("RGBA", size, (0, 0, 0, 0))
+    ImageDraw.Draw(overlay).ellipse(box, fill=(255, 0, 0, 51), outline=(255, 0, 0, 255), width=2)
+    image = Image.alpha_composite(image.convert("RGBA"), overlay).convert("RGB")
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=70, optimize=True)
+    if not complete:
+        raise IncompleteMapError(buffer.getvalue())
+    return buffer.getvalue()
+
+
+# 대화형 지도(folium) 한 번 표시에 실제로 내려받는 양 (바이트)
+# 지도 HTML + HTML이 불러오는 JS/CSS 파일(압축 전 크기) + 화면을 덮는 타일(디스크 캐시의 실제 파일 크기)
+# 받지 못한 파일은 빠지므로 complete가 False이면 실제보다 작은 값
+def measure_interactive_map_bytes(folium_map, lat, lon, zoom, size):
+    html = folium_map.get_root().render()
+    result = {"html": len(html.encode("utf-8")), "assets": 0, "tiles": 0, "complete": True}
+    for url in sorted(set(re.findall(r'<(?:script|link)[^>]+(?:src|href)="(https?://[^"]+)"', html))):
+        try:
+            result["assets"] += _asset_bytes(url)
+        except Exception:
+            result["complete"] = False
+
+    width, height = size
+    center_x, center_y = _lat_lon_to_pixel(lat, lon, zoom)
+    tiles = _tiles_covering(center_x - width / 2, center_y - height / 2, width, height)
+    for (x, y), tile in fetch_tiles(zoom, tiles).items():
+        if tile is None:
+            result["complete"] = False
+        else:
+            result["tiles"] += os.path.getsize(_tile_path(zoom, x, y))
+    result["total"] = result["html"] + result["assets"] + result["tiles"]
+    return result
+
+
+# JS/CSS 파일 크기 (URL마다 한 번만 내려받음, 실패는 캐시하지 않음)
+@st.cache_data(show_spinner=False)
+def _asset_bytes(url):
+    request = urllib.request.Request(url, headers={"User-Agent": "goyang-patrol-app"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return len(response.read())
@@ -0,0 +1,67 @@
+import streamlit as st
+import pandas as pd
+import folium
+from patrol_shared import load_patrol_locations, geocode_address_with_notice, require_admin
+from low_bandwidth import STATIC_MAP_ZOOM, render_static_map, measure_interactive_map_bytes
+
+# 지도 전송량 비교 페이지 (관리자 전용, ?token= 필요)
+# 순찰장소 한 곳의 지도를 표시할 때 내려받는 양을 저대역폭 모드(정적 이미지)와 대화형 지도(folium)로 실측해 비교
+# 대화형 지도 = 지도 HTML + HTML이 불러오는 JS/CSS(압축 전) + 화면을 덮는 OSM 타일
+# (st_folium 컴포넌트 자체의 번들과 Streamlit 기본 번들은 두 모드에 공통이므로 제외)
+
+st.set_page_config(
+    page_title="지도 전송량",
+    page_icon="📶",
+    layout="centered"
+)
+require_admin()
+
+# ★Final.py의 대화형 지도와 같은 설정
+INTERACTIVE_MAP_ZOOM = 16
+INTERACTIVE_MAP_SIZE = (700, 400)
+TARGET_REDUCTION = 10
+
+st.markdown("### 📶 지도 전송량 비교")
+
+patrol_locations = load_patrol_locations()
+if not patrol_locations:
+    st.error("CSV 파일을 로드하는 데 실패했습니다. 파일 형식 또는 경로를 확인하세요.")
+    st.stop()
+
+selected_team = st.selectbox("자율방범대", options=list(patrol_locations.keys()))
+selected_location = st.selectbox("순찰장소", options=list(patrol_locations[selected_team].keys()))
+info = patrol_locations[selected_team][selected_location]
+
+coords = geocode_address_with_notice(info["address"])
+if not coords:
+    st.stop()
+
+static_bytes = len(render_static_map(coords["lat"], coords["lon"]))
+
+m = folium.Map(location=[coords["lat"], coords["lon"]], zoom_start=INTERACTIVE_MAP_ZOOM, tiles="OpenStreetMap")
+folium.Circle(
+    location=[coords["lat"], coords["lon"]], radius=300, color="red", weight=2, fill=True, fill_opacity=0.2
+).add_to(m)
+interactive = measure_interactive_map_bytes(
+    m, coords["lat"], coords["lon"], INTERACTIVE_MAP_ZOOM, INTERACTIVE_MAP_SIZE
+)
+reduction = interactive["total"] / static_bytes
+
+col1, col2, col3 = st.columns(3)
+col1.metric("저대역폭 모드", f"{static_bytes / 1024:,.1f} KB")
+col2.metric("대화형 지도", f"{interactive['total'] / 1024:,.1f} KB")
+col3.metric("감소 비율", f"{reduction:,.1f}배")
+
+st.dataframe(pd.DataFrame([
+    {"모드": "저대역폭", "항목": f"정적 지도 JPEG (줌 {STATIC_MAP_ZOOM})", "bytes": static_bytes},
+    {"모드": "대화형", "항목": "지도 HTML", "bytes": interactive["html"]},
+    {"모드": "대화형", "항목": "JS/CSS", "bytes": interactive["assets"]},
+    {"모드": "대화형", "항목": f"타일 (줌 {INTERACTIVE_MAP_ZOOM})", "bytes": interactive["tiles"]},
+]), hide_index=True)
+
+if not interactive["complete"]:
+    st.warning("일부 파일이나 타일을 받지 못해 대화형 지도 전송량이 실제보다 작게 집계되었습니다.")
+elif reduction >= TARGET_REDUCTION:
+    st.success(f"저대역폭 모드 전송량이 대화형 지도의 1/{TARGET_REDUCTION} 이하입니다.")
+else:
+    st.warning(f"저대역폭 모드 전송량이 목표(1/{TARGET_REDUCTION})보다 큽니다.")
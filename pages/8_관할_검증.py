@@ -0,0 +1,72 @@
+import time
+
+import streamlit as st
+import pandas as pd
+from patrol_shared import load_patrol_locations, geocode_address, require_admin
+from jurisdiction import JURISDICTION_GEOJSON_PATH, get_jurisdiction_index, check_jurisdictions
+
+# 관할 검증 페이지 (관리자 전용, ?token= 필요)
+# 순찰장소 좌표가 patrol.csv의 해당관서 관할 안에 있는지, 고양시 밖으로 지오코딩되지 않았는지 일괄 확인
+
+st.set_page_config(
+    page_title="관할 검증",
+    page_icon="🗺️",
+    layout="centered"
+)
+require_admin()
+
+STATUS_LABELS = {
+    "ok": "일치",
+    "unassigned": "해당관서 없음",
+    "mismatch": "관할 불일치",
+    "out_of_area": "고양시 밖 좌표",
+    "no_coords": "좌표 없음",
+}
+
+st.markdown("### 🗺️ 관할 검증")
+
+patrol_locations = load_patrol_locations()
+jurisdiction_index = get_jurisdiction_index()
+if not patrol_locations:
+    st.error("CSV 파일을 로드하는 데 실패했습니다. 파일 형식 또는 경로를 확인하세요.")
+    st.stop()
+if not jurisdiction_index:
+    st.warning(f"관할 경계 파일({JURISDICTION_GEOJSON_PATH})이 없어 검증을 건너뜁니다.")
+    st.stop()
+
+# 데이터를 읽을 때(patrol.csv / 관할 경계 파일이 바뀔 때마다) 자동으로 확인하는 것은 CSV 좌표뿐이므로
+# 좌표 없는 장소가 고양시 밖으로 지오코딩되었는지는 이 옵션을 켜거나 각 장소 화면에서만 확인됨
+st.caption(
+    "CSV에 좌표가 없는 장소는 아래 옵션을 켜야 지오코딩 좌표로 확인합니다. "
+    "해당관서가 비어 있어 좌표상 관서로 채운 장소는 서버 로그에 unassigned로 기록됩니다."
+)
+# CSV에 좌표가 없는 장소는 지오코딩 좌표로 확인 (캐시에 없으면 초당 1건씩 조회하므로 느릴 수 있음)
+coords = None
+if st.checkbox("CSV에 좌표가 없는 장소는 지오코딩 좌표 사용"):
+    coords = {}
+    for locations in patrol_locations.values():
+        for info in locations.values():
+            if info["lat"] is not None and info["lon"] is not None:
+                continue
+            try:
+                point = geocode_address(info["address"])
+            except Exception as e:
+                st.warning(f"지오코딩 중 오류 발생: {info['address']} ({e})")
+                continue
+            if point:
+                coords[info["address"]] = point
+
+start = time.perf_counter()
+results = check_jurisdictions(jurisdiction_index, patrol_locations, coords)
+elapsed_ms = (time.perf_counter() - start) * 1000
+
+df = pd.DataFrame(results)
+df["status"] = df["status"].map(STATUS_LABELS)
+counts = df["status"].value_counts()
+
+col1, col2, col3 = st.columns(3)
+col1.metric("순찰장소", len(df))
+col2.metric("확인 필요", int(len(df) - counts.get("일치", 0)))
+col3.metric("검증 시간", f"{elapsed_ms:.1f} ms")
+
+st.dataframe(df.sort_values("status"), hide_index=True)
@@ -0,0 +1,120 @@
+import os
+import resource
+import sys
+from collections import defaultdict
+from types import MappingProxyType
+
+import streamlit as st
+import pandas as pd
+from streamlit import runtime
+from patrol_shared import load_patrol_locations, require_admin
+from patrol_search import get_search_index
+from jurisdiction import get_jurisdiction_index
+
+# 메모리 진단 페이지 (관리자 전용, ?token= 필요)
+# 프로세스 상주 메모리(RSS)와 세션별 / 캐시별 메모리 사용량을 바이트 단위로 보여줌
+
+st.set_page_config(
+    page_title="메모리 진단",
+    page_icon="🩺",
+    layout="centered"
+)
+require_admin()
+
+
+# 현재 프로세스 상주 메모리 (리눅스는 /proc, 그 외는 최대 사용량으로 대체)
+def get_process_rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS는 바이트, 리눅스는 KB 단위
+        return max_rss if os.uname().sysname == "Darwin" else max_rss * 1024
+
+
+# 객체가 참조하는 컨테이너와 값까지 포함한 크기 (같은 객체는 한 번만 셈)
+def deep_sizeof(obj, seen=None):
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (dict, MappingProxyType)):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+# 접속 중인 세션별 st.session_state 크기 (Streamlit 내부 세션 관리자 사용)
+def get_session_sizes():
+    session_mgr = getattr(runtime.get_instance(), "_session_mgr", None) if runtime.exists() else None
+    if session_mgr is None or not hasattr(session_mgr, "list_active_sessions"):
+        return []
+    return [
+        (info.session.id, deep_sizeof(dict(info.session.session_state.filtered_state)))
+        for info in session_mgr.list_active_sessions()
+    ]
+
+
+# 공유 자원(st.cache_resource)은 직접 크기를 재고, st.cache_data는 런타임이 집계한 직렬화 크기(바이트)를 사용
+# (런타임의 세션/리소스 통계는 server.enableExpensiveMemoryStats가 꺼져 있으면 바이트가 아니라 항목 수임)
+def get_cache_sizes():
+    sizes = [
+        ("st_cache_resource", "순찰 데이터", deep_sizeof(load_patrol_locations())),
+        ("st_cache_resource", "검색 색인", deep_sizeof(get_search_index())),
+        ("st_cache_resource", "관할 경계 색인", deep_sizeof(get_jurisdiction_index())),
+    ]
+    if runtime.exists():
+        stats = runtime.get_instance().stats_mgr.get_stats()
+        # 버전에 따라 리스트 또는 {family: [stat, ...]} 형태로 반환됨
+        if hasattr(stats, "values"):
+            stats = [stat for family_stats in stats.values() for stat in family_stats]
+        totals = defaultdict(int)
+        for stat in stats:
+            if getattr(stat, "category_name", None) == "st_cache_data":
+                totals[stat.cache_name] += stat.byte_length
+        sizes += [("st_cache_data", cache_name, size) for cache_name, size in totals.items()]
+    return sizes
+
+
+def format_bytes(num_bytes):
+    for unit in ["B", "KB", "MB"]:
+        if num_bytes < 1024:
+            return f"{num_bytes:,.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:,.1f} GB"
+
+
+st.markdown("### 🩺 메모리 진단")
+
+session_rows = [
+    {"세션": session_id, "메모리": format_bytes(size), "bytes": size}
+    for session_id, size in get_session_sizes()
+]
+cache_rows = [
+    {"종류": category, "캐시": cache_name, "메모리": format_bytes(size), "bytes": size}
+    for category, cache_name, size in get_cache_sizes()
+]
+
+col1, col2, col3 = st.columns(3)
+col1.metric("프로세스 상주 메모리", format_bytes(get_process_rss()))
+col2.metric("접속 세션 수", len(session_rows))
+col3.metric(
+    "세션당 평균",
+    format_bytes(sum(row["bytes"] for row in session_rows) / len(session_rows)) if session_rows else "-"
+)
+
+st.markdown("#### 세션별 메모리 (st.session_state)")
+if session_rows:
+    st.dataframe(pd.DataFrame(session_rows).sort_values("bytes", ascending=False), hide_index=True)
+else:
+    st.info("집계된 세션이 없습니다.")
+
+st.markdown("#### 캐시별 메모리 (프로세스 공유)")
+st.dataframe(pd.DataFrame(cache_rows).sort_values("bytes", ascending=False), hide_index=True)
+
+st.button("새로고침")
@@ -0,0 +1,127 @@
+import math
+import re
+from collections import defaultdict
+
+import streamlit as st
+from patrol_shared import load_patrol_locations, patrol_data_version
+
+# 자율방범대 / 순찰장소 / 주소 / 지역 특성 통합 검색
+# 한글 음절 2-gram + 자모 2-gram 역색인을 프로세스당 한 번 만들어 두고, 입력할 때마다 색인만 조회
+
+# 필드별 가중치 (이름이 일치하는 결과를 설명 일부가 일치하는 결과보다 위로)
+FIELD_WEIGHTS = {
+    "자율방범대": 3.0,
+    "순찰장소": 3.0,
+    "address": 2.0,
+    "description": 1.0,
+}
+MIN_SCORE = 0.3
+# 자모 n-gram만 일치하는 경우(오타)에는 더 높은 일치 비율을 요구 (이 값을 넘어야 함)
+# 두 글자 검색어는 모든 이름에 들어 있는 "자율방범대"의 자모와 정확히 절반이 겹칠 수 있어 같은 값은 제외
+MIN_JAMO_SCORE = 0.5
+# 점수는 이 자리수로 반올림 (n-gram 합산 순서에 따른 부동소수점 오차로 결과가 바뀌지 않도록)
+SCORE_DIGITS = 6
+JAMO_NGRAM = 2
+# 자모 n-gram은 이름 필드에만 색인 (긴 주소·설명은 흔한 자모 조합이 많아 오타 검색을 흐림)
+JAMO_FIELDS = {"자율방범대", "순찰장소"}
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+
+
+def normalize(text):
+    return re.sub(r"[\W_]+", "", str(text)).lower()
+
+
+# 한글 음절을 자모로 분해 (오타가 음절 안의 자모 하나인 경우에도 대부분의 n-gram이 일치하도록)
+def to_jamo(text):
+    jamo = []
+    for char in text:
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            jamo.append(CHOSEONG[code // 588])
+            jamo.append(JUNGSEONG[(code % 588) // 28])
+            if code % 28:
+                jamo.append(JONGSEONG[code % 28])
+        else:
+            jamo.append(char)
+    return "".join(jamo)
+
+
+def _ngrams(text, n):
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+# 검색용 n-gram 집합 (음절 2-gram과 자모 2-gram은 서로 섞이지 않도록 접두어로 구분)
+def make_grams(text, jamo=True):
+    text = normalize(text)
+    grams = {"s:" + gram for gram in _ngrams(text, 2)}
+    if jamo:
+        grams |= {"j:" + gram for gram in _ngrams(to_jamo(text), JAMO_NGRAM)}
+    return grams
+
+
+def build_search_index(patrol_locations):
+    docs = []
+    postings = defaultdict(dict)
+    for team, locations in patrol_locations.items():
+        for location, info in locations.items():
+            doc_id = len(docs)
+            docs.append((team, location))
+            fields = {"자율방범대": team, "순찰장소": location, "address": info["address"], "description": info["description"]}
+            for field, value in fields.items():
+                for gram in make_grams(value, jamo=field in JAMO_FIELDS):
+                    postings[gram][doc_id] = max(postings[gram].get(doc_id, 0.0), FIELD_WEIGHTS[field])
+    idf = {gram: math.log(1 + len(docs) / len(doc_weights)) for gram, doc_weights in postings.items()}
+    return {
+        "docs": docs,
+        "postings": dict(postings),
+        "idf": idf,
+        "teams": sorted(patrol_locations.keys()),
+    }
+
+
+# 검색 색인 (데이터 버전마다 한 번 생성, 모든 세션이 공유)
+def get_search_index():
+    return _load_search_index(patrol_data_version())
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_search_index(version):
+    return build_search_index(load_patrol_locations())
+
+
+# 검색어와 겹치는 n-gram의 비율(idf 가중)로 점수를 매겨 (자율방범대, 순찰장소, 점수) 목록을 반환
+# 음절 n-gram과 자모 n-gram의 일치 비율을 따로 계산해 큰 쪽을 점수로 사용
+# (한 글자 오타로 음절 n-gram이 모두 어긋나도 자모 n-gram 비율로 찾을 수 있도록)
+def search(index, query, limit=8):
+    grams = make_grams(query)
+    if not grams:
+        return []
+    max_weight = max(FIELD_WEIGHTS.values())
+    missing_idf = math.log(1 + len(index["docs"]))
+    scores = {}
+    for kind in ("s:", "j:"):
+        kind_grams = sorted(gram for gram in grams if gram.startswith(kind))
+        # 색인에 없는 n-gram(오타)도 분모에 포함해 일치 비율이 낮아지도록 함
+        total = sum(index["idf"].get(gram, missing_idf) for gram in kind_grams) * max_weight
+        if not total:
+            continue
+        kind_scores = defaultdict(float)
+        for gram in kind_grams:
+            doc_weights = index["postings"].get(gram)
+            if not doc_weights:
+                continue
+            gram_idf = index["idf"][gram]
+            for doc_id, weight in doc_weights.items():
+                kind_scores[doc_id] += gram_idf * weight
+        for doc_id, score in kind_scores.items():
+            score = round(score / total, SCORE_DIGITS)
+            if (score >= MIN_SCORE) if kind == "s:" else (score > MIN_JAMO_SCORE):
+                scores[doc_id] = max(scores.get(doc_id, 0.0), score)
+    # 점수가 같으면 CSV 순서대로
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return [(*index["docs"][doc_id], score) for doc_id, score in ranked[:limit]]
@@ -0,0 +1,194 @@
+import hmac
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+
+import streamlit as st
+import pandas as pd
+from geopy.geocoders import Nominatim
+from openai import OpenAI
+from dotenv import load_dotenv
+from jurisdiction import get_jurisdiction_index, check_jurisdictions, jurisdiction_data_version
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 프로세스 전체에서 한 번만 만들어 모든 세션이 공유하는 읽기 전용 자원 모음
+# (세션별로는 소속 방범대, 순찰장소, 테마 같은 작은 상태만 st.session_state에 저장)
+
+# CSV 파일 경로 (실행 위치와 상관없이 이 파일 옆의 patrol.csv 사용)
+CSV_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "patrol.csv")
+REQUIRED_COLUMNS = ["자율방범대", "순찰장소", "address", "description", "해당관서"]
+# 선택 열: 좌표가 있으면 관할 확인(jurisdiction.py)에 사용
+COORDINATE_COLUMNS = ["lat", "lon"]
+
+SYSTEM_PROMPT = "당신은 자율방범대에게 순찰 시 필요한 사항을 안내해주는 안내자입니다."
+
+PATROL_PROMPT_TEMPLATE = """
+[지시사항]
+당신은 자율방범대에게 순찰 시 필요한 사항을 안내해주는 안내자입니다.
+{location}에서 자율방범대원이 순찰할 때 필요한 사항을 상세히 설명해주세요.
+지역적 특성 {description}에 입력된 내용을 바탕으로 필요사항을 설명해주세요.
+순찰 시 범죄취약지역, 방범시설 부족지역을 발견하면 경찰서 CPO에게 통보하고, 긴급한 상황이 발생하면 112에 신고해야 합니다.
+경찰서 CPO에게는 신고하는 것이 아니라 범죄취약요인을 발견하게 되면 CPO에게 "통보"하는 것입니다.
+[제한사항]
+순찰노선을 정해주지 않고 자율적으로 순찰하도록 하는 것이 중요합니다.
+순찰 시 유의사항을 5개까지만 추천해주고 눈에 들어오기 쉽게 짧게 작성해야합니다.
+"""
+
+
+# 데이터 버전 (CSV, 관할 경계 파일 수정 시각) - 둘 중 하나가 바뀌면 데이터와 데이터에서 만든 색인을 다시 생성하는 캐시 키
+def patrol_data_version(file_path=CSV_FILE_PATH):
+    return os.path.getmtime(file_path), jurisdiction_data_version()
+
+
+# CSV 파일로 데이터 읽어오기 (버전마다 한 번, 세션 간 공유되므로 수정 불가능한 형태로 반환)
+def load_patrol_locations(file_path=CSV_FILE_PATH):
+    return _load_patrol_locations(file_path, patrol_data_version(file_path))
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_patrol_locations(file_path, version):
+    df = pd.read_csv(file_path)
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        st.error(f"CSV 파일에 필수 열({', '.join(REQUIRED_COLUMNS)})이 누락되었습니다.")
+        return None
+    df = df.astype(object).where(df.notna(), None)
+    patrol_data = {}
+    for row in df.to_dict("records"):
+        team = row["자율방범대"]
+        location = row["순찰장소"]
+        if team not in patrol_data:
+            patrol_data[team] = {}
+        lat, lon = (row.get(col) for col in COORDINATE_COLUMNS)
+        patrol_data[team][location] = {
+            "address": row["address"],
+            "description": row["description"],
+            "해당관서": row["해당관서"],
+            "lat": float(lat) if lat is not None else None,
+            "lon": float(lon) if lon is not None else None
+        }
+    # CSV에 적힌 그대로 관할을 확인해 로그에 남긴 뒤, 해당관서가 비어 있는 장소는 좌표상 관서로 채움
+    jurisdiction_index = get_jurisdiction_index()
+    if jurisdiction_index:
+        results = check_jurisdictions(jurisdiction_index, patrol_data)
+        log_jurisdiction_issues(results)
+        for row in results:
+            if row["status"] == "unassigned":
+                patrol_data[row["자율방범대"]][row["순찰장소"]]["해당관서"] = row["좌표상 관서"]
+    return MappingProxyType({
+        team: MappingProxyType({location: MappingProxyType(info) for location, info in locations.items()})
+        for team, locations in patrol_data.items()
+    })
+
+
+# 데이터를 다시 읽을 때마다(버전당 한 번) 관할 확인 결과를 서버 로그에 남김
+# 불일치 / 고양시 밖 좌표 / 해당관서 없음(좌표상 관서로 채움)은 장소별로, 좌표 없는 장소는 건수만 기록
+# CSV 좌표만 확인하므로 좌표 없는 장소의 지오코딩 결과(고양시 밖 등)는 장소 화면이나 관할 검증 페이지에서만 확인됨
+# (대원 화면에는 표시하지 않고 관리자는 관할 검증 페이지에서 전체 목록 확인)
+def log_jurisdiction_issues(results):
+    counts = {}
+    for row in results:
+        counts[row["status"]] = counts.get(row["status"], 0) + 1
+        if row["status"] in ("mismatch", "out_of_area", "unassigned"):
+            logger.warning(
+                "관할 확인 %s: %s / %s (해당관서=%s, 좌표상 관서=%s)",
+                row["status"], row["자율방범대"], row["순찰장소"], row["해당관서"], row["좌표상 관서"]
+            )
+    if len(results) - counts.get("ok", 0):
+        logger.warning("관할 확인 결과: %s", ", ".join(f"{status} {count}건" for status, count in sorted(counts.items())))
+
+
+# 관리자 전용 페이지 확인 (PATROL_ADMIN_TOKEN 환경변수와 주소의 ?token= 값이 같아야 열람 가능)
+def require_admin():
+    token = os.getenv("PATROL_ADMIN_TOKEN")
+    if not token or not hmac.compare_digest(st.query_params.get("token", ""), token):
+        st.error("관리자 전용 페이지입니다.")
+        st.stop()
+
+
+# 외부 API 호출 간격 제한 (프로세스 전체 공유, 백그라운드 미리 불러오기 포함)
+class RateLimiter:
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.min_interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+# Nominatim 사용 정책: 초당 1건
+geocode_rate_limiter = RateLimiter(1.0)
+openai_rate_limiter = RateLimiter(0.2)
+
+
+# OpenAI 클라이언트 (HTTP 커넥션 풀을 세션마다 새로 만들지 않도록 공유)
+@st.cache_resource(show_spinner=False)
+def get_openai_client():
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("🚨 ERROR: 'OPENAI_API_KEY'를 찾을 수 없습니다! 경찰서 담당자에게 문의해주시기 바랍니다.")
+    return OpenAI(api_key=api_key)
+
+
+# 지오코더 (timeout 10초)
+@st.cache_resource(show_spinner=False)
+def get_geolocator():
+    return Nominatim(user_agent="geoapi", timeout=10)
+
+
+def get_ai_response(prompt):
+    openai_rate_limiter.wait()
+    response = get_openai_client().chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=500,
+        temperature=0
+    )
+    return response.choices[0].message.content
+
+
+# 순찰 시 주요 착안사항(AI) - 같은 장소는 모든 세션이 같은 답변을 재사용 (temperature=0)
+@st.cache_data(show_spinner=False)
+def get_patrol_guidance(location, description):
+    return get_ai_response(PATROL_PROMPT_TEMPLATE.format(location=location, description=description))
+
+
+# 지오코딩 (캐시 없음): 주소를 찾지 못하면 None, 네트워크/서버 오류는 예외 그대로 전달
+# 백그라운드 스레드에서도 호출되므로 st.* 화면 출력을 하지 않음
+def fetch_coordinates(address):
+    geocode_rate_limiter.wait()
+    location = get_geolocator().geocode(address)
+    if location:
+        return {"lat": location.latitude, "lon": location.longitude}
+    return None
+
+
+# 캐싱 처리된 지오코딩 함수 (예외는 캐시되지 않으므로 일시적인 오류 뒤에는 다시 시도함)
+@st.cache_data(show_spinner=False)
+def geocode_address(address):
+    return fetch_coordinates(address)
+
+
+# 화면용 지오코딩: 실패 사유를 화면에 표시하고 None 반환 (스크립트 실행 스레드에서만 호출)
+def geocode_address_with_notice(address):
+    try:
+        coords = geocode_address(address)
+    except Exception as e:
+        st.error(f"지오코딩 중 오류 발생: {e}")
+        return None
+    if coords is None:
+        st.warning(f"주소를 찾을 수 없습니다: {address}")
+    return coords
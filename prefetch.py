@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from patrol_shared import load_patrol_locations, patrol_data_version, geocode_address, get_patrol_guidance
+
+# 소속 방범대를 고르면 그 방범대의 모든 순찰장소 좌표와 AI 착안사항을 백그라운드에서 미리 불러옴
+# 결과는 geocode_address / get_patrol_guidance의 공유 캐시에 저장되므로 다른 장소로 바꿔도 바로 표시됨
+# (외부 API 호출 간격은 patrol_shared의 RateLimiter가 제한)
+# 지오코딩/AI 호출이 실패하면 예외가 캐시되지 않고 future에 남으므로 다음 요청 때 다시 시도함
+# (작업 스레드에서 실행되므로 st.* 화면 출력을 하는 함수는 호출하지 않음)
+
+PREFETCH_WORKERS = 2
+
+
+def _prefetch_location(location, info):
+    geocode_address(info["address"])
+    get_patrol_guidance(location, info["description"])
+
+
+class TeamPrefetcher:
+    def __init__(self, max_workers=PREFETCH_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        # 이미 미리 불러오기를 요청한 (데이터 버전, 방범대) (여러 세션이 같은 방범대를 골라도 한 번만 요청)
+        self._futures = {}
+
+    def prefetch_team(self, team):
+        # CSV가 바뀌어도 최신 데이터를 쓰도록 매번 공유 캐시에서 가져옴
+        version = patrol_data_version()
+        patrol_locations = load_patrol_locations()
+        if team not in patrol_locations:
+            return
+        key = (version, team)
+        with self._lock:
+            # 데이터가 바뀌면 이전 버전의 기록은 버리고 바뀐 장소를 다시 불러옴
+            self._futures = {k: futures for k, futures in self._futures.items() if k[0] == version}
+            futures = self._futures.get(key)
+            # 진행 중이거나 성공한 방범대는 건너뜀 (실패한 작업이 있으면 다시 요청)
+            if futures and not any(future.done() and future.exception() for future in futures):
+                return
+            self._futures[key] = [
+                self._executor.submit(_prefetch_location, location, info)
+                for location, info in patrol_locations[team].items()
+            ]
+
+
+# 프로세스당 하나의 작은 스레드 풀 (모든 세션이 공유)
+@st.cache_resource(show_spinner=False)
+def get_prefetcher():
+    return TeamPrefetcher()
@@ -0,0 +1,316 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime
+
+import streamlit as st
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 취약지역 통보 대기열
+# 제출된 통보는 로컬 추가 전용 로그(queue.jsonl)에 바로 기록하고 (화면은 기다리지 않음),
+# 백그라운드 작업자가 묶음 단위로 서버에 전송한 뒤 전송 완료된 id를 synced.jsonl에 기록
+# 서버가 거부한 통보(4xx)나 다른 통보는 받는데 그 통보만 계속 실패하는 경우는 dead_letter.jsonl로 옮겨 뒤의 통보를 막지 않음
+
+REPORT_QUEUE_DIR = os.getenv(
+    "REPORT_QUEUE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports")
+)
+# 전송 주소가 없으면 통보는 로컬에만 쌓이고 주소가 설정되면 그때 전송됨
+REPORT_SYNC_URL = os.getenv("REPORT_SYNC_URL")
+REPORT_SYNC_INTERVAL = float(os.getenv("REPORT_SYNC_INTERVAL", "10"))
+REPORT_BATCH_SIZE = 20
+MAX_BACKOFF_SECONDS = 300
+# 다른 통보는 전송되는데 이 통보만 서버 오류로 이만큼 실패하면 dead letter로 옮김
+# (네트워크 끊김, 게이트웨이 오류(502/503/504), 서버 전체 장애는 세지 않음)
+MAX_SEND_ATTEMPTS = 5
+# 서버 전체가 내려간 것을 뜻하는 응답 (통보 자체의 문제가 아님)
+SERVER_UNAVAILABLE_CODES = (502, 503, 504)
+# 같은 내용의 통보를 중복으로 보지 않는 시간 (이후에 다시 통보하면 새 통보로 접수)
+DEDUP_WINDOW_SECONDS = 10 * 60
+
+
+# 서버가 통보를 받아들이지 않음 (다시 보내도 같은 결과, 4xx)
+class PermanentSendError(Exception):
+    pass
+
+
+# 기본 전송 함수: 묶음을 JSON으로 POST 하고 2xx 응답이면 성공
+# 4xx(408 시간 초과, 429 요청 과다 제외)는 PermanentSendError, 5xx와 네트워크 오류는 그대로 전달(재시도)
+def make_http_sender(url, timeout=10):
+    def send_batch(batch):
+        body = json.dumps({"reports": batch}, ensure_ascii=False).encode("utf-8")
+        request = urllib.request.Request(
+            url, data=body, method="POST",
+            headers={"Content-Type": "application/json; charset=utf-8"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return 200 <= response.status < 300
+        except urllib.error.HTTPError as e:
+            if 400 <= e.code < 500 and e.code not in (408, 429):
+                raise PermanentSendError(f"HTTP {e.code}") from e
+            raise
+    return send_batch
+
+
+# 통보 자체의 문제일 수 있는 실패인지 (네트워크 끊김과 서버 다운은 제외)
+def _may_be_report_error(error):
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code not in SERVER_UNAVAILABLE_CODES
+    return not isinstance(error, OSError)
+
+
+def _created_timestamp(record):
+    try:
+        return datetime.strptime(record["created_at"], "%Y-%m-%dT%H:%M:%S%z").timestamp()
+    except (KeyError, ValueError):
+        return 0.0
+
+
+class ReportQueue:
+    # sender: 통보 묶음(list[dict])을 받아 성공 여부를 돌려주는 함수 (테스트에서는 로컬 스텁으로 교체)
+    #         거부된 묶음은 PermanentSendError, 일시적인 실패는 그 밖의 예외나 False로 알림
+    def __init__(self, queue_dir=REPORT_QUEUE_DIR, sender=None, interval=REPORT_SYNC_INTERVAL,
+                 batch_size=REPORT_BATCH_SIZE, max_attempts=MAX_SEND_ATTEMPTS,
+                 dedup_window=DEDUP_WINDOW_SECONDS):
+        self.queue_dir = queue_dir
+        self.queue_path = os.path.join(queue_dir, "queue.jsonl")
+        self.synced_path = os.path.join(queue_dir, "synced.jsonl")
+        self.dead_letter_path = os.path.join(queue_dir, "dead_letter.jsonl")
+        self.photo_dir = os.path.join(queue_dir, "photos")
+        self.sender = sender
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.dedup_window = dedup_window
+        os.makedirs(self.photo_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._failures = 0
+        # 실패하면 묶음 크기를 절반씩 줄여 문제 있는 통보를 골라냄 (성공하면 원래 크기로)
+        self._batch_limit = batch_size
+        self._attempts = {}
+        self.last_error = None
+
+        # 기존 로그를 다시 읽어 전송 대기 목록과 중복 확인용 지문(최근 것만)을 복원
+        done = set(record["id"] for record in self._read_log(self.synced_path))
+        done |= set(record["id"] for record in self._read_log(self.dead_letter_path))
+        self._pending = []
+        self._fingerprints = {}
+        now = time.time()
+        for record in self._read_log(self.queue_path):
+            created = _created_timestamp(record)
+            if now - created < self.dedup_window:
+                self._fingerprints[record["fingerprint"]] = created
+            if record["id"] not in done:
+                self._pending.append(record)
+
+    @staticmethod
+    def _read_log(path):
+        if not os.path.exists(path):
+            return []
+        records = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # 기록 도중 종료되어 잘린 마지막 줄은 무시
+                    continue
+        return records
+
+    @staticmethod
+    def _append_log(path, records):
+        with open(path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    # 통보 접수: 로그에 한 줄 추가만 하고 바로 반환
+    # (같은 내용을 DEDUP_WINDOW_SECONDS 안에 다시 제출하면 무시하고 None 반환)
+    def submit(self, team, location, content, category=None, lat=None, lon=None,
+               address=None, photo=None, photo_name=None):
+        fingerprint = hashlib.sha256(
+            "|".join([team, location, category or "", content]).encode("utf-8") + (photo or b"")
+        ).hexdigest()
+        now = time.time()
+        record = {
+            "id": uuid.uuid4().hex,
+            "fingerprint": fingerprint,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(now)),
+            "team": team,
+            "location": location,
+            "address": address,
+            "lat": lat,
+            "lon": lon,
+            "category": category,
+            "content": content,
+            "photo": None,
+        }
+        with self._lock:
+            self._fingerprints = {
+                key: created for key, created in self._fingerprints.items() if now - created < self.dedup_window
+            }
+            if fingerprint in self._fingerprints:
+                return None
+            if photo:
+                ext = os.path.splitext(photo_name or "")[1].lower() or ".jpg"
+                record["photo"] = os.path.join(self.photo_dir, record["id"] + ext)
+                with open(record["photo"], "wb") as f:
+                    f.write(photo)
+            self._append_log(self.queue_path, [record])
+            self._fingerprints[fingerprint] = now
+            self._pending.append(record)
+        self._wake.set()
+        return record["id"]
+
+    # 전송 대기 건수 (report_ids를 주면 그중 아직 대기 중인 것만, 예: 한 세션이 접수한 통보)
+    def pending_count(self, report_ids=None):
+        with self._lock:
+            if report_ids is None:
+                return len(self._pending)
+            report_ids = set(report_ids)
+            return sum(1 for record in self._pending if record["id"] in report_ids)
+
+    # 전송할 묶음 (사진은 base64로 포함)
+    def _build_batch(self, records):
+        batch = []
+        for record in records:
+            item = {key: value for key, value in record.items() if key not in ("fingerprint", "photo")}
+            if record["photo"] and os.path.exists(record["photo"]):
+                with open(record["photo"], "rb") as f:
+                    item["photo"] = base64.b64encode(f.read()).decode("ascii")
+                item["photo_name"] = os.path.basename(record["photo"])
+            batch.append(item)
+        return batch
+
+    # 묶음 전송 -> (전송된 통보, 거부된 통보와 사유, 일시적 오류)
+    # 거부된 묶음은 반으로 나눠 다시 보내 거부된 통보만 골라냄
+    def _deliver(self, records):
+        try:
+            if self.sender(self._build_batch(records)):
+                return records, [], None
+            return [], [], RuntimeError("전송 실패 응답")
+        except PermanentSendError as e:
+            if len(records) == 1:
+                return [], [(records[0], str(e))], None
+            middle = len(records) // 2
+            sent, rejected, error = self._deliver(records[:middle])
+            if error is not None:
+                return sent, rejected, error
+            more_sent, more_rejected, error = self._deliver(records[middle:])
+            return sent + more_sent, rejected + more_rejected, error
+        except Exception as e:
+            return [], [], e
+
+    # 한 묶음 전송 시도 (전송되었거나 dead letter로 옮겨진 건수, 보낼 것이 없거나 실패하면 0)
+    def sync_once(self):
+        if self.sender is None:
+            return 0
+        with self._lock:
+            records = self._pending[:self._batch_limit]
+        if not records:
+            return 0
+
+        sent, rejected, error = self._deliver(records)
+        # 한 건만 보내도 실패하면 다음 통보를 하나 보내 봄
+        # 다음 통보는 전송되면 이 통보만의 문제로 보고 시도 횟수에 넣음 (둘 다 실패하면 서버 장애로 보고 세지 않음)
+        report_error = False
+        if error is not None and len(records) == 1 and _may_be_report_error(error):
+            with self._lock:
+                probe = self._pending[1:2]
+            if probe:
+                probe_sent, probe_rejected, probe_error = self._deliver(probe)
+                sent += probe_sent
+                rejected += probe_rejected
+                report_error = probe_error is None
+            if report_error:
+                record = records[0]
+                self._attempts[record["id"]] = self._attempts.get(record["id"], 0) + 1
+                if self._attempts[record["id"]] >= self.max_attempts:
+                    rejected.append((record, f"{self.max_attempts}회 전송 실패: {error}"))
+
+        done = sent + [record for record, _ in rejected]
+        if done:
+            done_ids = set(record["id"] for record in done)
+            with self._lock:
+                if sent:
+                    self._append_log(self.synced_path, [{"id": record["id"]} for record in sent])
+                if rejected:
+                    self._append_log(self.dead_letter_path, [
+                        {"id": record["id"], "reason": reason} for record, reason in rejected
+                    ])
+                self._pending = [record for record in self._pending if record["id"] not in done_ids]
+            for record_id in done_ids:
+                self._attempts.pop(record_id, None)
+
+        if error is None:
+            self._failures = 0
+            self._batch_limit = self.batch_size
+            self.last_error = None
+        elif report_error:
+            # 서버는 정상이므로 기다리지 않고 이 통보를 한 건씩 다시 보냄
+            self._failures = 0
+            self._batch_limit = 1
+            self.last_error = str(error)
+        else:
+            self._failures += 1
+            self._batch_limit = max(1, len(records) // 2)
+            self.last_error = str(error)
+        return len(done)
+
+    # 연속 실패 횟수에 따른 재시도 간격 (두 배씩 늘리되 최대 5분, 지수는 넘치지 않도록 제한)
+    def backoff_seconds(self):
+        return min(self.interval * 2 ** min(self._failures, 16), MAX_BACKOFF_SECONDS)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                # 대기 중인 통보를 모두 보내거나 실패할 때까지 연속 전송
+                while self.sync_once():
+                    pass
+            except Exception as e:
+                # 로그 기록 실패(디스크 가득 참 등)에도 작업자가 멈추지 않고 다음 주기에 다시 시도
+                logger.exception("통보 전송 작업 중 오류")
+                self._failures += 1
+                self.last_error = str(e)
+            if self._failures:
+                # 실패가 이어지면 재시도 간격을 늘림 (새 통보가 들어와도 기다림)
+                self._stop.wait(self.backoff_seconds())
+            else:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="report-sync", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+# 프로세스당 하나의 대기열과 전송 작업자 (모든 세션이 공유)
+@st.cache_resource(show_spinner=False)
+def get_report_queue():
+    sender = make_http_sender(REPORT_SYNC_URL) if REPORT_SYNC_URL else None
+    return ReportQueue(sender=sender).start()
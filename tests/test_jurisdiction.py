@@ -0,0 +1,131 @@
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import patrol_shared
+from jurisdiction import GRID_SIZE, build_jurisdiction_index, check_jurisdictions, find_jurisdiction, station_name
+
+
+def square(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+
+
+# 경도(x) 0~20, 위도(y) 0~30 안의 가상 관할 구역
+# 화정지구대: 가운데에 구멍이 있는 사각형 / 행신지구대: 떨어진 두 사각형(MultiPolygon)
+GEOJSON = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "properties": {"해당관서": "화정지구대(031-930-6112)"},
+            "geometry": {"type": "Polygon", "coordinates": [square(0, 0, 10, 10), square(4, 4, 6, 6)]},
+        },
+        {
+            "type": "Feature",
+            "properties": {"name": "행신지구대"},
+            "geometry": {"type": "MultiPolygon", "coordinates": [
+                [square(10, 0, 20, 10)],
+                [square(0, 20, 10, 30)],
+            ]},
+        },
+        # 이름이 없거나 면이 아닌 feature는 무시
+        {"type": "Feature", "properties": {}, "geometry": {"type": "Polygon", "coordinates": [square(0, 10, 10, 20)]}},
+        {"type": "Feature", "properties": {"name": "능곡지구대"}, "geometry": {"type": "Point", "coordinates": [5, 15]}},
+    ],
+}
+
+
+@pytest.fixture
+def index():
+    return build_jurisdiction_index(GEOJSON)
+
+
+def location(station, lat=None, lon=None, address="주소"):
+    return {"address": address, "description": "설명", "해당관서": station, "lat": lat, "lon": lon}
+
+
+def test_station_name_strips_phone_number():
+    assert station_name("화정지구대(031-930-6112)") == "화정지구대"
+    assert station_name(" 행신지구대 ") == "행신지구대"
+    assert station_name(None) == ""
+
+
+def test_index_skips_unnamed_and_non_polygon_features(index):
+    assert [district["name"] for district in index["districts"]] == [
+        "화정지구대(031-930-6112)", "행신지구대", "행신지구대"
+    ]
+    assert index["bbox"] == (0, 0, 20, 30)
+    assert build_jurisdiction_index({"features": []}) is None
+
+
+def test_point_in_polygon_with_hole(index):
+    assert find_jurisdiction(index, 1, 1) == "화정지구대(031-930-6112)"
+    # 구멍 안은 어느 관할도 아님
+    assert find_jurisdiction(index, 5, 5) is None
+    assert find_jurisdiction(index, 5, 3) == "화정지구대(031-930-6112)"
+
+
+def test_multipolygon_parts_map_to_same_station(index):
+    assert find_jurisdiction(index, 5, 15) == "행신지구대"
+    assert find_jurisdiction(index, 25, 5) == "행신지구대"
+    # 두 조각 사이(이름 없는 feature 자리)는 관할 밖
+    assert find_jurisdiction(index, 15, 5) is None
+
+
+def test_points_at_and_outside_bbox_edge(index):
+    # 바운딩 박스 최댓값은 마지막 격자 칸으로 처리 (칸 번호가 GRID_SIZE를 넘지 않음)
+    assert find_jurisdiction(index, 30, 20) is None
+    assert find_jurisdiction(index, 29.999, 9.999) == "행신지구대"
+    assert find_jurisdiction(index, 9.999, 19.999) == "행신지구대"
+    assert all(gx < GRID_SIZE and gy < GRID_SIZE for gx, gy in index["grid"])
+    assert find_jurisdiction(index, -1, 5) is None
+    assert find_jurisdiction(index, 5, 21) is None
+
+
+def test_check_jurisdictions_statuses(index):
+    patrol_locations = {
+        "화정동 자율방범대": {
+            "일치": location("화정지구대", lat=1, lon=1),
+            "불일치": location("화정지구대", lat=5, lon=15),
+            "해당관서 없음": location(None, lat=25, lon=5),
+            "구멍": location("화정지구대", lat=5, lon=5),
+            "좌표 없음": location("화정지구대"),
+            "지오코딩 좌표": location("행신지구대", address="지오코딩 주소"),
+        }
+    }
+    coords = {"지오코딩 주소": {"lat": 2, "lon": 12}}
+
+    results = check_jurisdictions(index, patrol_locations, coords)
+
+    assert {row["순찰장소"]: row["status"] for row in results} == {
+        "일치": "ok",
+        "불일치": "mismatch",
+        "해당관서 없음": "unassigned",
+        "구멍": "out_of_area",
+        "좌표 없음": "no_coords",
+        "지오코딩 좌표": "ok",
+    }
+    assert results[2]["좌표상 관서"] == "행신지구대"
+
+
+def test_loader_reports_blank_station_before_filling(tmp_path, monkeypatch, caplog, index):
+    csv_path = tmp_path / "patrol.csv"
+    csv_path.write_text(
+        "자율방범대,순찰장소,address,description,해당관서,lat,lon\n"
+        "화정동 자율방범대,로데오거리 일대,주소1,설명,,25,5\n"
+        "화정동 자율방범대,화정역 광장,주소2,설명,화정지구대,5,15\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(patrol_shared, "get_jurisdiction_index", lambda: index)
+
+    with caplog.at_level(logging.WARNING, logger="patrol_shared"):
+        data = patrol_shared._load_patrol_locations(str(csv_path), ("test", os.path.getmtime(csv_path)))
+
+    # 비어 있던 해당관서는 좌표상 관서로 채우되 로그에는 unassigned로 남김
+    assert data["화정동 자율방범대"]["로데오거리 일대"]["해당관서"] == "행신지구대"
+    assert "관할 확인 unassigned: 화정동 자율방범대 / 로데오거리 일대" in caplog.text
+    assert "관할 확인 mismatch: 화정동 자율방범대 / 화정역 광장" in caplog.text
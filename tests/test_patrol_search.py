@@ -0,0 +1,83 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import patrol_search
+from patrol_search import build_search_index, search
+
+
+def location(address, description):
+    return {"address": address, "description": description, "해당관서": None, "lat": None, "lon": None}
+
+
+PATROL_LOCATIONS = {
+    "화정동 자율방범대": {
+        "로데오거리 일대": location("경기 고양시 덕양구 화신로260번길 33", "유흥가 밀집"),
+        "화정역 광장": location("경기 고양시 덕양구 화정로 1", "역 광장"),
+    },
+    "행신2동 자율방범대": {
+        "행신역 일대": location("경기도 고양시 덕양구 용현로5번길 40", "역세권"),
+        "소만마을 공원": location("경기도 고양시 덕양구 행신동 1", "공원"),
+    },
+    "대화동 자율방범대": {
+        "장성초 일대": location("경기 고양시 일산서구 대화동 1", "학교 주변"),
+        "장성중 일대": location("경기 고양시 일산서구 대화동 2", "학교 주변"),
+    },
+}
+
+
+def places(results):
+    return [place for _, place, _ in results]
+
+
+def test_exact_name_ranks_first():
+    index = build_search_index(PATROL_LOCATIONS)
+    assert places(search(index, "로데오")) == ["로데오거리 일대"]
+    assert places(search(index, "행신역"))[0] == "행신역 일대"
+
+
+def test_one_syllable_typo_still_matches():
+    index = build_search_index(PATROL_LOCATIONS)
+    # 음절 n-gram은 모두 어긋나지만 자모 n-gram 비율로 찾음
+    assert places(search(index, "로대오")) == ["로데오거리 일대"]
+    assert places(search(index, "로데어")) == ["로데오거리 일대"]
+    assert places(search(index, "행싱역"))[0] == "행신역 일대"
+
+
+def test_jamo_only_match_needs_higher_score(monkeypatch):
+    index = build_search_index(PATROL_LOCATIONS)
+    # 자모 n-gram 일치 비율이 MIN_SCORE 이상이지만 MIN_JAMO_SCORE 미만인 검색어
+    assert search(index, "러데요") == []
+
+    monkeypatch.setattr(patrol_search, "MIN_JAMO_SCORE", patrol_search.MIN_SCORE)
+    assert places(search(index, "러데요")) == ["로데오거리 일대"]
+
+
+def test_half_jamo_overlap_is_not_a_match():
+    index = build_search_index(PATROL_LOCATIONS)
+    # "장성"의 자모 n-gram은 모든 방범대 이름("자율방범대")과 정확히 절반이 겹침
+    for _ in range(20):
+        assert places(search(index, "장성")) == ["장성초 일대", "장성중 일대"]
+
+
+def test_unrelated_query_returns_nothing():
+    index = build_search_index(PATROL_LOCATIONS)
+    assert search(index, "라디오") == []
+    assert search(index, "") == []
+
+
+def test_ties_keep_csv_order():
+    index = build_search_index(PATROL_LOCATIONS)
+    results = search(index, "장성")
+    assert places(results) == ["장성초 일대", "장성중 일대"]
+    assert results[0][2] == results[1][2]
+
+    # 모든 장소가 같은 점수인 경우에도 입력 순서대로
+    expected = [place for locations in PATROL_LOCATIONS.values() for place in locations]
+    assert places(search(index, "고양")) == expected
+
+
+def test_limit():
+    index = build_search_index(PATROL_LOCATIONS)
+    assert len(search(index, "고양", limit=3)) == 3
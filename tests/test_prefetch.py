@@ -0,0 +1,73 @@
+import os
+import sys
+from concurrent.futures import wait
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import prefetch
+from prefetch import TeamPrefetcher
+
+
+def location(address):
+    return {"address": address, "description": "설명"}
+
+
+# 공유 데이터 대신 버전을 바꿀 수 있는 데이터와 호출 기록으로 교체
+class FakeData:
+    def __init__(self, monkeypatch, fail=()):
+        self.version = 1
+        self.locations = {"화정동 자율방범대": {"로데오거리 일대": location("화신로260번길 33")}}
+        self.calls = []
+        self.fail = set(fail)
+        monkeypatch.setattr(prefetch, "patrol_data_version", lambda: self.version)
+        monkeypatch.setattr(prefetch, "load_patrol_locations", lambda: self.locations)
+        monkeypatch.setattr(prefetch, "_prefetch_location", self.prefetch_location)
+
+    def prefetch_location(self, location, info):
+        self.calls.append(location)
+        if location in self.fail:
+            self.fail.discard(location)
+            raise OSError("지오코딩 시간 초과")
+
+
+def prefetch_and_wait(prefetcher, team):
+    prefetcher.prefetch_team(team)
+    for futures in prefetcher._futures.values():
+        wait(futures)
+
+
+def test_team_is_prefetched_once(monkeypatch):
+    data = FakeData(monkeypatch)
+    prefetcher = TeamPrefetcher()
+    prefetch_and_wait(prefetcher, "화정동 자율방범대")
+    prefetch_and_wait(prefetcher, "화정동 자율방범대")
+    prefetch_and_wait(prefetcher, "-소속 자율방범대를 선택하세요-")
+
+    assert data.calls == ["로데오거리 일대"]
+
+
+def test_failed_prefetch_is_retried(monkeypatch):
+    data = FakeData(monkeypatch, fail={"로데오거리 일대"})
+    prefetcher = TeamPrefetcher()
+    prefetch_and_wait(prefetcher, "화정동 자율방범대")
+    prefetch_and_wait(prefetcher, "화정동 자율방범대")
+    prefetch_and_wait(prefetcher, "화정동 자율방범대")
+
+    assert data.calls == ["로데오거리 일대", "로데오거리 일대"]
+
+
+def test_new_data_version_is_prefetched_again(monkeypatch):
+    data = FakeData(monkeypatch)
+    prefetcher = TeamPrefetcher()
+    prefetch_and_wait(prefetcher, "화정동 자율방범대")
+
+    # patrol.csv 수정: 장소 추가
+    data.version = 2
+    data.locations = {"화정동 자율방범대": {
+        "로데오거리 일대": location("화신로260번길 33"),
+        "화정역 광장": location("화정로 1"),
+    }}
+    prefetch_and_wait(prefetcher, "화정동 자율방범대")
+
+    assert sorted(data.calls) == ["로데오거리 일대", "로데오거리 일대", "화정역 광장"]
+    assert list(prefetcher._futures) == [(2, "화정동 자율방범대")]
@@ -0,0 +1,251 @@
+import json
+import os
+import sys
+import time
+import urllib.error
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_queue import PermanentSendError, ReportQueue
+
+
+# 로컬 스텁 서버: 받은 통보를 기록하고, 지정한 통보는 거부하거나(reject) 계속 오류로 응답하며(broken)
+# 처음 fail_times번은 모든 요청에 오류로 응답함
+class StubSender:
+    def __init__(self, reject=(), broken=(), fail_times=0, error=None):
+        self.received = []
+        self.calls = 0
+        self.reject = set(reject)
+        self.broken = set(broken)
+        self.fail_times = fail_times
+        self.error = error or OSError("네트워크 연결 끊김")
+
+    def __call__(self, batch):
+        self.calls += 1
+        if self.fail_times:
+            self.fail_times -= 1
+            raise self.error
+        if any(item["content"] in self.broken for item in batch):
+            raise self.error
+        if any(item["content"] in self.reject for item in batch):
+            raise PermanentSendError("HTTP 413")
+        self.received.extend(batch)
+        return True
+
+
+def submit_many(queue, count, prefix="내용"):
+    return [queue.submit("화정동 자율방범대", "로데오거리 일대", f"{prefix}{i}") for i in range(count)]
+
+
+def read_ids(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["id"] for line in f]
+
+
+def test_sync_sends_pending_reports_in_batches(tmp_path):
+    sender = StubSender()
+    queue = ReportQueue(str(tmp_path), sender=sender, batch_size=4)
+    ids = submit_many(queue, 10)
+
+    while queue.sync_once():
+        pass
+
+    assert [item["id"] for item in sender.received] == ids
+    assert sender.calls == 3
+    assert queue.pending_count() == 0
+    assert sorted(read_ids(queue.synced_path)) == sorted(ids)
+
+
+def test_photo_is_sent_as_base64(tmp_path):
+    sender = StubSender()
+    queue = ReportQueue(str(tmp_path), sender=sender)
+    queue.submit("화정동 자율방범대", "로데오거리 일대", "가로등 고장", photo=b"\xff\xd8jpeg", photo_name="a.JPG")
+
+    queue.sync_once()
+
+    assert sender.received[0]["photo"] == "/9hqcGVn"
+    assert sender.received[0]["photo_name"].endswith(".jpg")
+
+
+def test_network_failure_backs_off_and_keeps_reports(tmp_path):
+    sender = StubSender(fail_times=3)
+    queue = ReportQueue(str(tmp_path), sender=sender, batch_size=4, max_attempts=2)
+    ids = submit_many(queue, 5)
+
+    for expected_failures in (1, 2, 3):
+        assert queue.sync_once() == 0
+        assert queue._failures == expected_failures
+    assert queue.pending_count() == 5
+    # 네트워크 오류는 시도 횟수에 넣지 않으므로 dead letter로 가지 않음
+    assert read_ids(queue.dead_letter_path) == []
+
+    while queue.sync_once():
+        pass
+    assert [item["id"] for item in sender.received] == ids
+    assert queue._failures == 0
+
+
+def test_rejected_report_does_not_block_queue(tmp_path):
+    sender = StubSender(reject={"내용2"})
+    queue = ReportQueue(str(tmp_path), sender=sender, batch_size=4)
+    ids = submit_many(queue, 7)
+
+    while queue.sync_once():
+        pass
+
+    assert queue.pending_count() == 0
+    assert read_ids(queue.dead_letter_path) == [ids[2]]
+    assert [item["id"] for item in sender.received] == ids[:2] + ids[3:]
+
+
+def server_error(code):
+    return urllib.error.HTTPError("http://stub", code, "error", None, None)
+
+
+def test_repeated_server_errors_move_report_to_dead_letter(tmp_path):
+    sender = StubSender(broken={"내용0"}, error=server_error(500))
+    queue = ReportQueue(str(tmp_path), sender=sender, batch_size=4, max_attempts=3)
+    ids = submit_many(queue, 6)
+
+    for _ in range(20):
+        if not queue.pending_count():
+            break
+        queue.sync_once()
+
+    # 다른 통보는 전송되는데 이 통보만 계속 실패하므로 dead letter로 옮겨짐
+    assert queue.pending_count() == 0
+    assert read_ids(queue.dead_letter_path) == [ids[0]]
+    assert sorted(item["id"] for item in sender.received) == sorted(ids[1:])
+
+
+@pytest.mark.parametrize("code", [500, 502, 503, 504])
+def test_server_outage_does_not_drop_reports(tmp_path, code):
+    sender = StubSender(fail_times=8, error=server_error(code))
+    queue = ReportQueue(str(tmp_path), sender=sender, batch_size=4, max_attempts=2)
+    ids = submit_many(queue, 10)
+
+    # 장애 중에는 한 건도 전송되지 않고 재시도 간격만 늘어남
+    while sender.fail_times > 1:
+        assert queue.sync_once() == 0
+    assert queue._failures >= 3
+
+    while sender.fail_times:
+        queue.sync_once()
+    while queue.sync_once():
+        pass
+    # 서버 전체 장애는 통보의 문제가 아니므로 시도 횟수에 넣지 않고 복구 후 모두 전송
+    assert read_ids(queue.dead_letter_path) == []
+    assert [item["id"] for item in sender.received] == ids
+
+
+def test_backoff_is_capped_after_long_outage(tmp_path):
+    queue = ReportQueue(str(tmp_path), interval=10)
+    queue._failures = 5000
+    assert queue.backoff_seconds() == 300
+
+
+def test_background_worker_survives_unexpected_errors(tmp_path, monkeypatch):
+    sender = StubSender()
+    queue = ReportQueue(str(tmp_path), sender=sender, interval=0.05)
+    original_append = queue._append_log
+    failures = iter([OSError("디스크 가득 참")])
+
+    # 첫 전송 완료 기록만 실패시킴
+    def flaky_append(path, records):
+        if path == queue.synced_path:
+            error = next(failures, None)
+            if error:
+                raise error
+        original_append(path, records)
+
+    monkeypatch.setattr(queue, "_append_log", flaky_append)
+    monkeypatch.setattr("report_queue.MAX_BACKOFF_SECONDS", 0.05)
+    ids = submit_many(queue, 3)
+    queue.start()
+    try:
+        deadline = time.time() + 5
+        while queue.pending_count() and time.time() < deadline:
+            time.sleep(0.02)
+    finally:
+        queue.stop()
+
+    assert queue.pending_count() == 0
+    assert sorted(read_ids(queue.synced_path)) == sorted(ids)
+
+
+def test_restart_recovers_pending_from_logs(tmp_path):
+    sender = StubSender(reject={"내용1"})
+    queue = ReportQueue(str(tmp_path), sender=sender, batch_size=1)
+    ids = submit_many(queue, 4)
+    queue.sync_once()
+    queue.sync_once()
+
+    restarted = ReportQueue(str(tmp_path), sender=StubSender())
+    assert restarted.pending_count() == 2
+    while restarted.sync_once():
+        pass
+    assert [item["id"] for item in restarted.sender.received] == ids[2:]
+    # 재시작 후에도 최근 통보는 중복으로 걸러냄
+    assert restarted.submit("화정동 자율방범대", "로데오거리 일대", "내용0") is None
+
+
+def test_pending_count_for_own_reports(tmp_path):
+    queue = ReportQueue(str(tmp_path))
+    mine = submit_many(queue, 2, prefix="내 통보")
+    submit_many(queue, 3, prefix="다른 대원 통보")
+
+    assert queue.pending_count() == 5
+    assert queue.pending_count(mine) == 2
+    assert queue.pending_count([]) == 0
+
+
+def test_truncated_last_log_line_is_ignored(tmp_path):
+    queue = ReportQueue(str(tmp_path))
+    ids = submit_many(queue, 2)
+    with open(queue.queue_path, "a", encoding="utf-8") as f:
+        f.write('{"id": "cut')
+
+    assert [record["id"] for record in ReportQueue(str(tmp_path))._pending] == ids
+
+
+def test_duplicates_are_only_dropped_within_window(tmp_path):
+    queue = ReportQueue(str(tmp_path), dedup_window=60)
+    assert queue.submit("화정동 자율방범대", "로데오거리 일대", "가로등 고장")
+    assert queue.submit("화정동 자율방범대", "로데오거리 일대", "가로등 고장") is None
+
+    # 창이 지난 지문은 새 통보로 접수
+    queue._fingerprints = {key: created - 120 for key, created in queue._fingerprints.items()}
+    assert queue.submit("화정동 자율방범대", "로데오거리 일대", "가로등 고장")
+    assert queue.pending_count() == 2
+
+
+def test_background_worker_syncs_submissions(tmp_path):
+    sender = StubSender()
+    queue = ReportQueue(str(tmp_path), sender=sender, interval=0.05).start()
+    try:
+        ids = submit_many(queue, 30)
+        deadline = time.time() + 5
+        while queue.pending_count() and time.time() < deadline:
+            time.sleep(0.02)
+    finally:
+        queue.stop()
+
+    assert sorted(item["id"] for item in sender.received) == sorted(ids)
+
+
+@pytest.mark.parametrize("code, permanent", [(400, True), (413, True), (429, False), (503, False)])
+def test_http_sender_classifies_status_codes(monkeypatch, code, permanent):
+    import report_queue
+
+    def fake_urlopen(request, timeout):
+        raise urllib.error.HTTPError(request.full_url, code, "error", None, None)
+
+    monkeypatch.setattr(report_queue.urllib.request, "urlopen", fake_urlopen)
+    send_batch = report_queue.make_http_sender("http://stub")
+    expected = PermanentSendError if permanent else urllib.error.HTTPError
+    with pytest.raises(expected):
+        send_batch([{"id": "1"}])
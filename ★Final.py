@@ -2,78 +2,22 @@ import json
 import random, os, math
 import streamlit as st
 import pandas as pd
-from geopy.geocoders import Nominatim
 from streamlit_option_menu import option_menu
-from openai import OpenAI
-from dotenv import load_dotenv
 import folium
 from streamlit_folium import st_folium  # pip install folium streamlit-folium
+from patrol_shared import load_patrol_locations, geocode_address_with_notice, get_patrol_guidance
+from patrol_search import get_search_index, search
+from jurisdiction import get_jurisdiction_index, find_jurisdiction, station_name
+from prefetch import get_prefetcher
+from report_queue import get_report_queue
+from low_bandwidth import detect_low_bandwidth, render_static_map
 
-load_dotenv()
-
-# 환경변수에서 API 키 가져오기
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("🚨 ERROR: 'OPENAI_API_KEY'를 찾을 수 없습니다! 경찰서 담당자에게 문의해주시기 바랍니다.")
-
-# OpenAI 클라이언트 초기화
-client = OpenAI(api_key=api_key)
-
-def get_ai_response(prompt):
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "당신은 자율방범대에게 순찰 시 필요한 사항을 안내해주는 안내자입니다."},
-            {"role": "user", "content": prompt}
-        ],
-        max_tokens=500,
-        temperature=0
-    )
-    return response.choices[0].message.content
-
-# CSV 파일 경로
-CSV_FILE_PATH = "patrol.csv"
-
-# CSV 파일로 데이터 읽어오기
-def load_patrol_locations_from_csv(file_path):
-    df = pd.read_csv(file_path)
-    required_columns = ["자율방범대", "순찰장소", "address", "description", "해당관서"]
-    if not all(col in df.columns for col in required_columns):
-        st.error(f"CSV 파일에 필수 열({', '.join(required_columns)})이 누락되었습니다.")
-        return None
-    patrol_data = {}
-    for _, row in df.iterrows():
-        team = row["자율방범대"]
-        location = row["순찰장소"]
-        if team not in patrol_data:
-            patrol_data[team] = {}
-        patrol_data[team][location] = {
-            "address": row["address"],
-            "description": row["description"],
-            "해당관서": row["해당관서"]
-        }
-    return patrol_data
-
-patrol_locations = load_patrol_locations_from_csv(CSV_FILE_PATH)
+# 데이터 로드 (프로세스당 한 번 로드된 공유 데이터, 세션마다 복사하지 않음)
+patrol_locations = load_patrol_locations()
 if not patrol_locations:
     st.error("CSV 파일을 로드하는 데 실패했습니다. 파일 형식 또는 경로를 확인하세요.")
     st.stop()
 
-# 캐싱 처리 및 timeout 증가 (10초)로 지오코딩 함수 수정
-@st.cache_data(show_spinner=False)
-def geocode_address(address):
-    geolocator = Nominatim(user_agent="geoapi", timeout=10)
-    try:
-        location = geolocator.geocode(address)
-        if location:
-            return {"lat": location.latitude, "lon": location.longitude}
-        else:
-            st.warning(f"주소를 찾을 수 없습니다: {address}")
-            return None
-    except Exception as e:
-        st.error(f"지오코딩 중 오류 발생: {e}")
-        return None
-
 # 페이지 설정
 st.set_page_config(
     page_title="고양경찰서 순찰추천 챗봇",
@@ -83,7 +27,9 @@ st.set_page_config(
 
 # 앱 실행 시 기본 테마를 light 모드로 강제 (시스템 설정 무시)
 # 다크모드 토글을 최상단에 배치하여 사용자가 변경할 수 있도록 함
-dark_mode_toggle = st.checkbox("다크모드 전환", value=False)
+dark_mode_toggle = st.checkbox("다크모드 전환", value=False, key="dark_mode")
+# 저대역폭 모드 (Save-Data 설정 또는 ?lite=1 이면 자동으로 켜짐, 사용자가 직접 변경 가능)
+low_bandwidth_mode = st.checkbox("저대역폭 모드 (모바일 데이터 절약)", value=detect_low_bandwidth(), key="low_bandwidth")
 
 if dark_mode_toggle:
     text_color = "white"
@@ -92,50 +38,52 @@ else:
     text_color = "black"
     bg_color = "white"
 
-# 여백 제거 CSS
-st.markdown(f"""
-    <style>
-    body {{
-        background-color: {bg_color} !important;
-        color: {text_color} !important;
-    }}
-    .main .block-container {{
-        background-color: {bg_color} !important;
-        color: {text_color} !important;
-    }}
-    /* st_folium 주변 여백 제거 */
-    .element-container, .stFolio, .stBlock {{
-        margin-bottom: 0px !important;
-        padding-bottom: 0px !important;
-    }}
-    /* st_folium 내부 iframe 등에 대한 여백 제거 */
-    iframe {{
-        display: block;
-        margin: 0 auto !important;
-    }}
-    #map_container {{
-        margin: 0px !important;
-        padding: 0px !important;
-    }}
-    </style>
-""", unsafe_allow_html=True)
-
-# 헤더 및 설명 (dark mode 토글 이후에 렌더링되어 색상이 올바르게 적용됨)
-st.markdown(
-    f"""
-    <div style="text-align: center; font-size: 26px; color: {text_color}; margin-top: 20px;">
-        <b>👮Goyang Patrol APP GPA👮‍♂️</b>
-    </div>
+# 저대역폭 모드에서는 꾸밈용 CSS와 머리말 HTML을 생략
+if not low_bandwidth_mode:
+    # 여백 제거 CSS
+    st.markdown(f"""
+        <style>
+        body {{
+            background-color: {bg_color} !important;
+            color: {text_color} !important;
+        }}
+        .main .block-container {{
+            background-color: {bg_color} !important;
+            color: {text_color} !important;
+        }}
+        /* st_folium 주변 여백 제거 */
+        .element-container, .stFolio, .stBlock {{
+            margin-bottom: 0px !important;
+            padding-bottom: 0px !important;
+        }}
+        /* st_folium 내부 iframe 등에 대한 여백 제거 */
+        iframe {{
+            display: block;
+            margin: 0 auto !important;
+        }}
+        #map_container {{
+            margin: 0px !important;
+            padding: 0px !important;
+        }}
+        </style>
     """, unsafe_allow_html=True)
 
-st.markdown(
-    f"""
-    <div style="text-align: center; font-size: 17px; color: {text_color}; margin-top: 20px;">
-        <b>경찰서에서 순찰이 필요한 장소를 안내드립니다.</b><br>
-        고양경찰서 치안에 도움을 주시는 방범대원분들의<br>
-        노고에 감사드립니다.
-    </div>
-    """, unsafe_allow_html=True)
+    # 헤더 및 설명 (dark mode 토글 이후에 렌더링되어 색상이 올바르게 적용됨)
+    st.markdown(
+        f"""
+        <div style="text-align: center; font-size: 26px; color: {text_color}; margin-top: 20px;">
+            <b>👮Goyang Patrol APP GPA👮‍♂️</b>
+        </div>
+        """, unsafe_allow_html=True)
+
+    st.markdown(
+        f"""
+        <div style="text-align: center; font-size: 17px; color: {text_color}; margin-top: 20px;">
+            <b>경찰서에서 순찰이 필요한 장소를 안내드립니다.</b><br>
+            고양경찰서 치안에 도움을 주시는 방범대원분들의<br>
+            노고에 감사드립니다.
+        </div>
+        """, unsafe_allow_html=True)
 st.markdown("---")
 
 st.markdown(
@@ -145,8 +93,35 @@ st.markdown(
     </div>
     """, unsafe_allow_html=True)
     
-team_option = sorted(set(["화정동 자율방범대", "행신2동 어머니방범대", "성사1동 자율방범대", "성사2동 자율방범대", "주교동 자율방범대", "주교제일 자율방범대", "주교동 어머니방범대", "성사1동 어머니방범대", "능곡동 자율방범대", "행주동 어머니방범대", "창릉동 자율방범대", "흥도도래울 자율방범대", "고양높빛 자율방범대", "고양동 어머니방범대", "관산동 자율방범대", "관산동 어머니방범대", "덕은한강 자율방범대", "행신3동 자율방범대", "행신4동 자율방범대"]))
-selected_team = st.selectbox("-", options=team_option, index=0)
+# 통합 검색 (방범대, 순찰장소, 주소, 지역 특성)
+search_index = get_search_index()
+
+
+# 검색 결과를 누르면 소속 방범대와 순찰장소 선택을 바꿔줌 (위젯이 그려지기 전에 실행되는 콜백)
+def select_search_result(team, location):
+    st.session_state["team"] = team
+    st.session_state["location"] = location
+
+
+search_query = st.text_input("🔎 방범대·장소·주소 검색", key="search_query", placeholder="예) 화정동, 로데오, 초등학교")
+if search_query:
+    search_results = search(search_index, search_query)
+    if search_results:
+        for team, location, score in search_results:
+            st.button(f"{location} · {team}", key=f"search_{team}_{location}",
+                      on_click=select_search_result, args=(team, location))
+    else:
+        st.caption("검색 결과가 없습니다.")
+
+team_option = search_index["teams"]
+# 주소(?team=)에 남겨둔 마지막 방범대 복원 (새로고침해도 바로 미리 불러오기 시작)
+last_team = st.query_params.get("team")
+if "team" not in st.session_state and last_team in team_option:
+    st.session_state["team"] = last_team
+selected_team = st.selectbox("-", options=team_option, index=0, key="team")
+st.query_params["team"] = selected_team
+# 같은 방범대의 다른 순찰장소 좌표와 AI 착안사항을 백그라운드에서 미리 불러옴
+get_prefetcher().prefetch_team(selected_team)
     
 if selected_team != "-소속 자율방범대를 선택하세요-":
     locations = list(patrol_locations[selected_team].keys())
@@ -154,35 +129,40 @@ else:
     locations = []
     
 if selected_team != "-소속 자율방범대를 선택하세요-":
-    selected_location = st.selectbox("순찰 필요지역을 선택해주세요", options=locations)
+    selected_location = st.selectbox("순찰 필요지역을 선택해주세요", options=locations, key="location")
 
     if selected_location:
         info = patrol_locations[selected_team][selected_location]
         st.markdown(f"<h3>🗺️순찰 필요 지역</h3>", unsafe_allow_html=True)
         
         # 주소 지오코딩 (캐시 사용, timeout 10초)
-        coords = geocode_address(info['address'])
+        coords = geocode_address_with_notice(info['address'])
         if coords:
-            # 지도 타일은 기본 밝은 OpenStreetMap 사용
-            tile_provider = "OpenStreetMap"
-            m = folium.Map(
-                location=[coords['lat'], coords['lon']], 
-                zoom_start=16, 
-                tiles=tile_provider
-            )
-            # 중심 마커 없이 300m 원만 추가 (원의 중심이 geocode 결과 좌표와 일치)
-            folium.Circle(
-                location=[coords['lat'], coords['lon']],
-                radius=300,
-                color='red',
-                weight=2,
-                fill=True,
-                fill_opacity=0.2
-            ).add_to(m)
-            # 맵을 감싸는 DIV를 만들어 마진/패딩 최소화
-            st.markdown("<div id='map_container'>", unsafe_allow_html=True)
-            st_folium(m, width=700, height=400)
-            st.markdown("</div>", unsafe_allow_html=True)
+            if low_bandwidth_mode:
+                # 로컬 캐시 타일로 만든 작은 정적 지도 이미지 (장소별 캐시)
+                map_image = render_static_map(coords['lat'], coords['lon'])
+                st.image(map_image)
+            else:
+                # 지도 타일은 기본 밝은 OpenStreetMap 사용
+                tile_provider = "OpenStreetMap"
+                m = folium.Map(
+                    location=[coords['lat'], coords['lon']], 
+                    zoom_start=16, 
+                    tiles=tile_provider
+                )
+                # 중심 마커 없이 300m 원만 추가 (원의 중심이 geocode 결과 좌표와 일치)
+                folium.Circle(
+                    location=[coords['lat'], coords['lon']],
+                    radius=300,
+                    color='red',
+                    weight=2,
+                    fill=True,
+                    fill_opacity=0.2
+                ).add_to(m)
+                # 맵을 감싸는 DIV를 만들어 마진/패딩 최소화
+                st.markdown("<div id='map_container'>", unsafe_allow_html=True)
+                st_folium(m, width=700, height=400)
+                st.markdown("</div>", unsafe_allow_html=True)
         else:
             st.warning("주소 지오코딩 실패로 지도 표시 불가.")
         
@@ -212,18 +192,7 @@ if selected_team != "-소속 자율방범대를 선택하세요-":
             </div>
             """, unsafe_allow_html=True)
         st.info("💡AI 활용으로 답변에 오류가 있을 수 있습니다")
-        prompt = f"""
-        [지시사항]
-        당신은 자율방범대에게 순찰 시 필요한 사항을 안내해주는 안내자입니다.
-        {selected_location}에서 자율방범대원이 순찰할 때 필요한 사항을 상세히 설명해주세요.
-        지역적 특성 {info['description']}에 입력된 내용을 바탕으로 필요사항을 설명해주세요.
-        순찰 시 범죄취약지역, 방범시설 부족지역을 발견하면 경찰서 CPO에게 통보하고, 긴급한 상황이 발생하면 112에 신고해야 합니다.
-        경찰서 CPO에게는 신고하는 것이 아니라 범죄취약요인을 발견하게 되면 CPO에게 "통보"하는 것입니다.
-        [제한사항]
-        순찰노선을 정해주지 않고 자율적으로 순찰하도록 하는 것이 중요합니다. 
-        순찰 시 유의사항을 5개까지만 추천해주고 눈에 들어오기 쉽게 짧게 작성해야합니다.
-        """
-        response = get_ai_response(prompt)
+        response = get_patrol_guidance(selected_location, info['description'])
         st.info(response)
 
         st.markdown(
@@ -232,11 +201,49 @@ if selected_team != "-소속 자율방범대를 선택하세요-":
                 <b>🏚️ 취약지역 통보 </b>
             </div>
             """, unsafe_allow_html=True)
+        # 앱 안에서 바로 통보 (서버에 먼저 저장되고 연결되면 범죄예방진단팀으로 자동 전송)
+        # 전송 주소(REPORT_SYNC_URL)가 설정되지 않았으면 저장만 되므로 카카오톡 링크로 통보하도록 안내
+        report_queue = get_report_queue()
+        report_sync_enabled = report_queue.sender is not None
+        with st.form("vulnerability_report", clear_on_submit=True):
+            report_category = st.selectbox(
+                "취약요인", ["방범시설(CCTV·가로등 등) 부족", "시설물 파손·고장", "우범지역(인적 드묾·은신처)", "기타"]
+            )
+            report_content = st.text_area("내용", placeholder="발견한 취약요인과 위치를 간단히 적어주세요.")
+            report_photo = st.file_uploader("사진 (선택)", type=["jpg", "jpeg", "png"])
+            if st.form_submit_button("통보하기"):
+                if not report_content.strip():
+                    st.warning("내용을 입력해주세요.")
+                else:
+                    report_id = report_queue.submit(
+                        selected_team, selected_location, report_content.strip(),
+                        category=report_category,
+                        lat=coords["lat"] if coords else None,
+                        lon=coords["lon"] if coords else None,
+                        address=info["address"],
+                        photo=report_photo.getvalue() if report_photo else None,
+                        photo_name=report_photo.name if report_photo else None
+                    )
+                    if report_id:
+                        st.session_state.setdefault("report_ids", []).append(report_id)
+                    if report_id and report_sync_enabled:
+                        st.success("통보가 접수되었습니다. 연결 상태가 좋아지면 자동으로 전송됩니다.")
+                    elif report_id:
+                        st.warning("통보가 저장되었지만 범죄예방진단팀으로 자동 전송되지 않습니다. 아래 링크로 꼭 통보해주세요.")
+                    else:
+                        st.info("이미 접수된 통보입니다.")
+        # 이 세션에서 접수한 통보 중 아직 전송되지 않은 건수
+        own_pending = report_queue.pending_count(st.session_state.get("report_ids", []))
+        if report_sync_enabled and own_pending:
+            st.caption(f"내 통보 중 전송 대기: {own_pending}건")
+        if report_sync_enabled:
+            kakao_guide = "앱으로 통보가 어려우면 아래의 링크를 통해<br>경찰서 범죄예방진단팀에게 취약지역을 통보해주세요."
+        else:
+            kakao_guide = "아래의 링크를 통해 경찰서 범죄예방진단팀에게<br>취약지역을 통보해주세요."
         st.markdown(
             f"""
             <div style="text-align: center; font-size: 16px; color: {text_color}; margin-top: 20px;">
-                <b>아래의 링크를 통해 경찰서 범죄예방진단팀에게<br>
-                취약지역을 통보해주세요.<br>
+                <b>{kakao_guide}<br>
                 <a href="https://open.kakao.com/o/scgaTwdh" target="_blank" style="color: blue; font-weight: bold;">🔗 고양경찰서 범죄예방진단팀</a>
                 </b>
             </div>
@@ -247,7 +254,7 @@ if selected_team != "-소속 자율방범대를 선택하세요-":
                 <b>📑 기타 참고사항 </b>
             </div>
             """, unsafe_allow_html=True)
-        if "해당관서" in info:
+        if info["해당관서"]:
             st.markdown(
                 f"""
                 <div style="text-align: center; font-size: 16px; color: {text_color}; margin-top: 20px;">
@@ -255,6 +262,14 @@ if selected_team != "-소속 자율방범대를 선택하세요-":
                     해당 지역관서는 {info['해당관서']}입니다.</b>
                 </div>
                 """, unsafe_allow_html=True)
+        # 지도 좌표 기준 관할 확인 (관할 경계 파일이 있을 때만)
+        jurisdiction_index = get_jurisdiction_index()
+        if jurisdiction_index and coords:
+            coords_station = find_jurisdiction(jurisdiction_index, coords["lat"], coords["lon"])
+            if coords_station is None:
+                st.caption("⚠️ 지도 위치가 고양시 관할 구역 밖으로 표시되어 정확하지 않을 수 있습니다.")
+            elif station_name(coords_station) != station_name(info["해당관서"]):
+                st.caption(f"⚠️ 지도 위치 기준 관할은 {coords_station}입니다. 경찰서에 확인해주세요.")
         st.markdown(
             f"""
             <div style="text-align: left; font-size: 30px; color: {text_color}; margin-top: 20px;">
@@ -270,11 +285,12 @@ if selected_team != "-소속 자율방범대를 선택하세요-":
             </div>
             """, unsafe_allow_html=True)
 
-st.markdown("---")
-st.markdown(
-    f"""
-    <div style="text-align: center; font-size: 16px; color: {text_color}; margin-top: 20px;">
-        <b> 위 순찰추천 장소는 고양경찰서 범죄예방대응과에서 제작한 어플입니다.<br>
-        AI를 활용하여 답변에 오류가 발생할 수 있습니다.</b>
-    </div>
-    """, unsafe_allow_html=True)
+if not low_bandwidth_mode:
+    st.markdown("---")
+    st.markdown(
+        f"""
+        <div style="text-align: center; font-size: 16px; color: {text_color}; margin-top: 20px;">
+            <b> 위 순찰추천 장소는 고양경찰서 범죄예방대응과에서 제작한 어플입니다.<br>
+            AI를 활용하여 답변에 오류가 발생할 수 있습니다.</b>
+        </div>
+        """, unsafe_allow_html=True)